@@ -1,9 +1,14 @@
 import time
+from typing import Any, Dict, Optional
+
 from src.utils.config_loader import load_yaml_config
+from .common import CancellationToken, PackControl, ProgressCallback
 from .first_fit_row_wise import pack_first_fit_row_wise
+from .gap_filling import fill_shelf_gaps
 from .maxrects_packer import pack_with_maxrects
 from .shelf_algorithms import pack_shelf_fit_bwf, pack_shelf_fit_bfdh, pack_shelf_floor_ceiling
 from ..utils.logger_utils import logger
+from ..utils.output_writer import PlacementWriter
 
 # Mapping of algorithm keys to packing functions
 ALGORITHM_REGISTRY = {
@@ -14,22 +19,71 @@ ALGORITHM_REGISTRY = {
     "maxrects": pack_with_maxrects,
 }
 
+# Shelf packers that get the gap-filling post-pass, mapped to whether it may rotate pieces
+SHELF_PACKERS = {
+    pack_shelf_fit_bwf: False,
+    pack_shelf_fit_bfdh: False,
+    pack_shelf_floor_ceiling: True,
+}
+
 _config = load_yaml_config()
 _enabled_keys = _config.get("algorithms", [])
+_gap_fill = bool(_config.get("gap_fill", True))
+
+# Wrap each packer with timing logic, optional time budget / cancellation / progress,
+# optional streaming of placements to a writer (header, placements, summary trailer)
+# and, for shelf packers, the gap-filling post-pass
+def timed_wrapper(func, gap_fill: bool = False):
+    gap_fill = gap_fill and func in SHELF_PACKERS
 
-# Wrap each packer with timing logic
-def timed_wrapper(func):
-    def wrapper(*args, **kwargs):
+    def wrapper(
+        input_data: Dict[str, Any],
+        time_budget_s: Optional[float] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        progress: Optional[ProgressCallback] = None,
+        writer: Optional[PlacementWriter] = None,
+        keep_placements: bool = True,
+    ) -> Dict[str, Any]:
+        control = PackControl(
+            time_budget_s, cancel_token, progress,
+            label=func.__name__,
+            sink=writer.write_placement if writer is not None else None,
+            keep_placements=keep_placements,
+            track_footprints=gap_fill,
+            track_skipped=gap_fill,
+        )
+        if writer is not None:
+            writer.write_header({
+                "algorithm": func.__name__,
+                "fabric_width_cm": input_data["fabric_width_cm"],
+                "fabric_length_cm": input_data["fabric_length_cm"],
+                "fabric_margin_cm": input_data["fabric_margin_cm"],
+                "total_count": len(input_data["pieces"]),
+            })
         start = time.perf_counter()
-        result = func(*args, **kwargs)
+        result = func(input_data, control=control)
+        if gap_fill and not control.interrupted:
+            fill_shelf_gaps(
+                result, input_data, control, control.footprints, control.skipped,
+                allow_rotation=SHELF_PACKERS[func],
+            )
+            logger.info(f"Gap filling placed {result['gap_filled_count']} skipped pieces for '{func.__name__}'.")
         duration = time.perf_counter() - start
+        if writer is not None:
+            writer.write_summary({k: v for k, v in result.items() if k != "placements"})
         logger.info(f"Algorithm '{func.__name__}' took {duration:.3f} seconds.")
+        if not result["complete"]:
+            logger.warning(
+                f"Algorithm '{func.__name__}' stopped early, returning partial layout "
+                f"({result['placed_count']}/{result['total_count']} pieces placed)."
+            )
         return result
+    wrapper.__name__ = func.__name__
     return wrapper
 
 # Prepare list of timed packers
 PACKERS = [
-    timed_wrapper(ALGORITHM_REGISTRY[key])
+    timed_wrapper(ALGORITHM_REGISTRY[key], gap_fill=_gap_fill)
     for key in _enabled_keys
     if key in ALGORITHM_REGISTRY
 ]
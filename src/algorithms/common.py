@@ -1,7 +1,120 @@
-from typing import Any, Dict
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from src.utils.geometry_utils import calculate_bounding_box, calculate_polygon_area
 
+ProgressCallback = Callable[[Dict[str, Any]], None]
+PlacementSink = Callable[[Dict[str, Any]], None]
+# Compact placed bounding box: (id, x, y, width, height)
+Footprint = Tuple[str, float, float, float, float]
+
+
+def placement_footprint(placement: Dict[str, Any]) -> Footprint:
+    verts = placement["normalized_vertices_cm"]
+    return (
+        placement["id"],
+        placement["x_cm"],
+        placement["y_cm"],
+        max(x for x, _ in verts),
+        max(y for _, y in verts),
+    )
+
+
+class CancellationToken:
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+
+class PackControl:
+    """Time budget, cancellation, progress reporting and placement output for a single packer run.
+
+    Packers poll ``should_stop()`` between pieces and return the layout built so
+    far once it turns true, so every placement they have made stays valid.
+    Placements go through ``record()``, which streams them to ``sink`` and only
+    keeps them in the result when ``keep_placements`` is set. For post-passes,
+    ``track_footprints`` keeps the placed bounding boxes and ``track_skipped``
+    the metas of pieces passed to ``skip()``, so neither has to be rebuilt.
+    """
+
+    def __init__(
+        self,
+        time_budget_s: Optional[float] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        progress: Optional[ProgressCallback] = None,
+        progress_interval_s: float = 0.5,
+        label: str = "",
+        sink: Optional[PlacementSink] = None,
+        keep_placements: bool = True,
+        track_footprints: bool = False,
+        track_skipped: bool = False,
+    ):
+        self.deadline = None if time_budget_s is None else time.perf_counter() + time_budget_s
+        self.cancel_token = cancel_token
+        self.progress = progress
+        self.progress_interval_s = progress_interval_s
+        self.label = label
+        self.sink = sink
+        self.keep_placements = keep_placements
+        self.footprints: Optional[List[Footprint]] = [] if track_footprints else None
+        self.skipped: Optional[List[Dict[str, Any]]] = [] if track_skipped else None
+        self.interrupted = False
+        self._last_report = 0.0
+
+    def should_stop(self) -> bool:
+        if self.interrupted:
+            return True
+        if self.cancel_token is not None and self.cancel_token.cancelled:
+            self.interrupted = True
+        elif self.deadline is not None and time.perf_counter() >= self.deadline:
+            self.interrupted = True
+        return self.interrupted
+
+    def record(self, placements: List[Dict[str, Any]], placement: Dict[str, Any]) -> None:
+        if self.sink is not None:
+            self.sink(placement)
+        if self.keep_placements:
+            placements.append(placement)
+        if self.footprints is not None:
+            self.footprints.append(placement_footprint(placement))
+
+    def skip(self, meta: Dict[str, Any]) -> None:
+        if self.skipped is not None:
+            self.skipped.append(meta)
+
+    def report(self, placed_count: int, total_count: int, placed_area: float, fabric_area: float,
+               force: bool = False) -> None:
+        if self.progress is None:
+            return
+        now = time.perf_counter()
+        if not force and now - self._last_report < self.progress_interval_s:
+            return
+        self._last_report = now
+        self.progress({
+            "algorithm": self.label,
+            "placed_count": placed_count,
+            "total_count": total_count,
+            "utilization_pct": placed_area / fabric_area * 100 if fabric_area else 0.0,
+        })
+
+
+def compute_pieces_metadata(pieces: List[Dict[str, Any]], control: PackControl) -> List[Dict[str, Any]]:
+    # Polls the control too, so a budget is honoured even before placement starts
+    metas: List[Dict[str, Any]] = []
+    for piece in pieces:
+        if control.should_stop():
+            break
+        metas.append(compute_piece_metadata(piece))
+    return metas
+
 
 def compute_piece_metadata(piece: Dict[str, Any]) -> Dict[str, Any]:
 
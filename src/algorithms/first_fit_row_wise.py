@@ -1,10 +1,10 @@
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
-from .common import compute_piece_metadata
+from .common import PackControl, compute_pieces_metadata
 from ..utils.logger_utils import logger
 
 
-def pack_first_fit_row_wise(input_data: Dict[str, Any]) -> Dict[str, Any]:
+def pack_first_fit_row_wise(input_data: Dict[str, Any], control: Optional[PackControl] = None) -> Dict[str, Any]:
 
     # logger.info(f"\n")
     # logger.info(f"========= ========= First-Fit Row-Wise ========= =========")
@@ -12,7 +12,9 @@ def pack_first_fit_row_wise(input_data: Dict[str, Any]) -> Dict[str, Any]:
     fabric_l = input_data["fabric_length_cm"]
     margin = input_data["fabric_margin_cm"]
     placement_order = 1
-    pieces = [compute_piece_metadata(p) for p in input_data["pieces"]]
+    control = control or PackControl()
+    pieces = compute_pieces_metadata(input_data["pieces"], control)
+    total_count = len(input_data["pieces"])
 
     placements: List[Dict[str, Any]] = []
     x_cursor = 0.0
@@ -22,6 +24,8 @@ def pack_first_fit_row_wise(input_data: Dict[str, Any]) -> Dict[str, Any]:
     placed_count = 0
 
     for piece in pieces:
+        if control.should_stop():
+            break
 
         w, h = piece["width_cm"], piece["height_cm"]
 
@@ -32,9 +36,10 @@ def pack_first_fit_row_wise(input_data: Dict[str, Any]) -> Dict[str, Any]:
 
         if y_cursor + h > fabric_l:
             # logger.info("Skipping piece '%s': no vertical space", piece["id"])
+            control.skip(piece)
             continue
 
-        placements.append({
+        control.record(placements, {
             "id": piece["id"],
             "x_cm": x_cursor,
             "y_cm": y_cursor,
@@ -47,8 +52,10 @@ def pack_first_fit_row_wise(input_data: Dict[str, Any]) -> Dict[str, Any]:
         max_row_h = max(max_row_h, h)
         placed_area += piece["area_cm2"]
         placed_count += 1
+        control.report(placed_count, total_count, placed_area, fabric_w * fabric_l)
 
     total_area = fabric_w * fabric_l
+    control.report(placed_count, total_count, placed_area, total_area, force=True)
     waste = total_area - placed_area
 
     return {
@@ -57,7 +64,8 @@ def pack_first_fit_row_wise(input_data: Dict[str, Any]) -> Dict[str, Any]:
         "fabric_width_cm": fabric_w,
         "fabric_length_cm": fabric_l,
         "placed_count": placed_count,
-        "total_count": len(pieces),
+        "total_count": total_count,
         "placed_area_cm2": round(placed_area, 2),
         "waste_area_cm2": round(waste, 2),
+        "complete": not control.interrupted,
     }
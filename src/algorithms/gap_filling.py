@@ -0,0 +1,247 @@
+from bisect import bisect_right
+from collections import Counter
+from heapq import heapify, heappop, heappush
+from typing import Any, Dict, List, Optional, Tuple
+
+from .common import Footprint, PackControl, compute_piece_metadata, placement_footprint
+
+EPS = 1e-9
+
+# Free rectangle as (x, y, width, height)
+FreeRect = Tuple[float, float, float, float]
+
+# Width resolution of the eligible-rectangle index, as a fraction of the fabric width
+WIDTH_BUCKETS = 4096
+
+
+class _WidthIndex:
+    """Free rectangles bucketed by width, for "narrowest rectangle at least w wide" queries.
+
+    Each bucket is a max-heap on width. The bucket containing w is used if its
+    widest rectangle fits; otherwise a segment tree over bucket counts finds the
+    first non-empty wider bucket, where every rectangle fits. Push and pop are
+    O(log n + log WIDTH_BUCKETS); no fit is missed, and the chosen rectangle is
+    at most one bucket width wider than the narrowest fitting one.
+    """
+
+    def __init__(self, max_width: float, buckets: int = WIDTH_BUCKETS):
+        self.bucket_width = max(max_width, EPS) / buckets
+        self.n = buckets + 1
+        self.size = 1
+        while self.size < self.n:
+            self.size *= 2
+        self.counts = [0] * (2 * self.size)
+        self.buckets: List[List[Tuple[float, float, float, float]]] = [[] for _ in range(self.n)]
+
+    def _add(self, bucket: int, delta: int) -> None:
+        i = bucket + self.size
+        while i:
+            self.counts[i] += delta
+            i //= 2
+
+    def _bucket(self, width: float) -> int:
+        return min(max(int(width / self.bucket_width), 0), self.n - 1)
+
+    def push(self, width: float, x: float, y: float, height: float) -> None:
+        bucket = self._bucket(width)
+        heappush(self.buckets[bucket], (-width, x, y, height))
+        self._add(bucket, 1)
+
+    def _pop(self, bucket: int) -> Tuple[float, float, float, float]:
+        self._add(bucket, -1)
+        neg_w, x, y, height = heappop(self.buckets[bucket])
+        return -neg_w, x, y, height
+
+    def pop_fitting(self, width: float) -> Optional[Tuple[float, float, float, float]]:
+        first = self._bucket(width - EPS)
+        heap = self.buckets[first]
+        if heap and -heap[0][0] >= width - EPS:
+            return self._pop(first)
+        if first + 1 >= self.n:
+            return None
+        i = first + 1 + self.size
+        if not self.counts[i]:
+            # climb to the nearest non-empty subtree to the right, then descend to its leftmost leaf
+            while i > 1 and not (i % 2 == 0 and self.counts[i + 1]):
+                i //= 2
+            if i == 1:
+                return None
+            i += 1
+            while i < self.size:
+                i = 2 * i if self.counts[2 * i] else 2 * i + 1
+        return self._pop(i - self.size)
+
+
+def build_free_rects(
+    shelves: List[Dict[str, Any]],
+    footprints: List[Footprint],
+    fabric_width: float,
+    fabric_length: float,
+    margin: float,
+    control: Optional[PackControl] = None,
+) -> List[FreeRect]:
+    """Split the unused area of a shelf layout into disjoint rectangles.
+
+    Per shelf: the strip above each floor piece, below each ceiling piece, the
+    gaps between neighbouring pieces and the shelf end; plus the fabric above
+    the last shelf. Every rectangle already keeps ``margin`` to its neighbours.
+    Stops early, returning what it has, once ``control`` says to stop.
+    """
+    control = control or PackControl()
+    shelves = sorted(shelves, key=lambda s: s["y_cm"])
+    shelf_ys = [s["y_cm"] for s in shelves]
+    per_shelf: List[List[Footprint]] = [[] for _ in shelves]
+    for fp in footprints:
+        if control.should_stop():
+            return []
+        idx = bisect_right(shelf_ys, fp[2] + EPS) - 1
+        if idx >= 0:
+            per_shelf[idx].append(fp)
+
+    free: List[FreeRect] = []
+    for shelf, pieces in zip(shelves, per_shelf):
+        if control.should_stop():
+            return free
+        sy, sh = shelf["y_cm"], shelf["height_cm"]
+        top = sy + sh
+        left = 0.0
+        for _pid, x, y, w, h in sorted(pieces, key=lambda fp: fp[1]):
+            if x - margin - left > EPS:
+                free.append((left, sy, x - margin - left, sh))
+            if abs(y - sy) < EPS:
+                if top - (y + h + margin) > EPS:
+                    free.append((x, y + h + margin, w, top - (y + h + margin)))
+            elif abs(y + h - top) < EPS:
+                if y - margin - sy > EPS:
+                    free.append((x, sy, w, y - margin - sy))
+            left = max(left, x + w + margin)
+        if fabric_width - left > EPS:
+            free.append((left, sy, fabric_width - left, sh))
+
+    top_y = shelves[-1]["y_cm"] + shelves[-1]["height_cm"] + margin if shelves else 0.0
+    if fabric_length - top_y > EPS:
+        free.append((0.0, top_y, fabric_width, fabric_length - top_y))
+    return free
+
+
+def _skipped_metas(
+    input_data: Dict[str, Any],
+    footprints: List[Footprint],
+    control: PackControl,
+) -> List[Dict[str, Any]]:
+    # input pieces minus placed ones, matched by id as a multiset
+    placed_ids = Counter(fp[0] for fp in footprints)
+    metas: List[Dict[str, Any]] = []
+    for piece in input_data["pieces"]:
+        if control.should_stop():
+            break
+        if placed_ids[piece["id"]] > 0:
+            placed_ids[piece["id"]] -= 1
+            continue
+        metas.append(compute_piece_metadata(piece))
+    return metas
+
+
+def _stopped(result: Dict[str, Any]) -> Dict[str, Any]:
+    result["complete"] = False
+    return result
+
+
+def fill_shelf_gaps(
+    result: Dict[str, Any],
+    input_data: Dict[str, Any],
+    control: Optional[PackControl] = None,
+    footprints: Optional[List[Footprint]] = None,
+    skipped_metas: Optional[List[Dict[str, Any]]] = None,
+    allow_rotation: bool = False,
+) -> Dict[str, Any]:
+    """Place the pieces a shelf packer skipped into the gaps of its layout.
+
+    Skipped pieces are taken tallest first. A free rectangle becomes eligible
+    once it is at least as tall as the current piece (heights only shrink, so it
+    stays eligible), and the narrowest eligible rectangle that is wide enough is
+    used. Placing a piece splits its rectangle into the part to its right and
+    the part above it. Pending rectangles sit in a height heap and eligible ones
+    in a ``_WidthIndex``, so the pass runs in O((n + k) log n) for n placements
+    and k skipped pieces.
+
+    ``footprints`` and ``skipped_metas`` come from the packer's ``PackControl``
+    when available; otherwise they are rebuilt from the result and input. Every
+    setup loop polls ``control`` so the pass honours the packer's deadline.
+    """
+    control = control or PackControl()
+    fw = result["fabric_width_cm"]
+    fl = result["fabric_length_cm"]
+    m = input_data["fabric_margin_cm"]
+    result["gap_filled_count"] = 0
+    if footprints is None:
+        footprints = []
+        for placement in result["placements"]:
+            if control.should_stop():
+                return _stopped(result)
+            footprints.append(placement_footprint(placement))
+    if skipped_metas is None:
+        skipped_metas = _skipped_metas(input_data, footprints, control)
+
+    skipped: List[Tuple[float, float, bool, Dict[str, Any]]] = []
+    for meta in skipped_metas:
+        if control.should_stop():
+            return _stopped(result)
+        w, h = meta["width_cm"], meta["height_cm"]
+        # lie rotatable pieces on their long side so they need the shortest gap
+        if allow_rotation and h > w:
+            skipped.append((h, w, True, meta))
+        else:
+            skipped.append((w, h, False, meta))
+
+    if not skipped:
+        return result
+    skipped.sort(key=lambda s: (s[1], s[0]), reverse=True)
+
+    free = build_free_rects(result.get("shelves", []), footprints, fw, fl, m, control)
+    pending = [(-h, x, y, w) for x, y, w, h in free]
+    heapify(pending)
+    eligible = _WidthIndex(fw)
+
+    placement_order = result["placed_count"] + 1
+    placed_area = result["placed_area_cm2"]
+    filled = 0
+
+    for w, h, rotated, meta in skipped:
+        if control.should_stop():
+            break
+        while pending and -pending[0][0] >= h - EPS:
+            neg_h, x, y, fw_ = heappop(pending)
+            eligible.push(fw_, x, y, -neg_h)
+
+        fit = eligible.pop_fitting(w)
+        if fit is None:
+            continue
+        gw, gx, gy, gh = fit
+
+        if gw - w - m > EPS:
+            eligible.push(gw - w - m, gx + w + m, gy, gh)
+        if gh - h - m > EPS:
+            heappush(pending, (-(gh - h - m), gx, gy + h + m, w))
+
+        poly = meta["normalized_vertices_cm"]
+        control.record(result["placements"], {
+            "id": meta["id"],
+            "x_cm": gx,
+            "y_cm": gy,
+            "normalized_vertices_cm": [[y0, x0] for x0, y0 in poly] if rotated else poly,
+            "placement_order": placement_order,
+        })
+        placement_order += 1
+        placed_area += meta["area_cm2"]
+        filled += 1
+        control.report(result["placed_count"] + filled, result["total_count"], placed_area, fw * fl)
+
+    control.report(result["placed_count"] + filled, result["total_count"], placed_area, fw * fl, force=True)
+
+    result["placed_count"] += filled
+    result["placed_area_cm2"] = round(placed_area, 2)
+    result["waste_area_cm2"] = round(fw * fl - placed_area, 2)
+    result["gap_filled_count"] = filled
+    result["complete"] = result.get("complete", True) and not control.interrupted
+    return result
@@ -1,12 +1,12 @@
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from rectpack import MaxRectsBssf, PackingMode, newPacker
 
-from .common import compute_piece_metadata
+from .common import PackControl, compute_pieces_metadata
 from ..utils.logger_utils import logger
 
 
-def pack_with_maxrects(input_data: Dict[str, Any]) -> Dict[str, Any]:
+def pack_with_maxrects(input_data: Dict[str, Any], control: Optional[PackControl] = None) -> Dict[str, Any]:
 
     # logger.info(f"\n")
     # logger.info(f"========= ========= MaxRects BSSF ========= =========")
@@ -14,40 +14,47 @@ def pack_with_maxrects(input_data: Dict[str, Any]) -> Dict[str, Any]:
     fabric_l = input_data["fabric_length_cm"]
     margin = input_data["fabric_margin_cm"]
     placement_order = 1
+    control = control or PackControl()
 
     usable_w = fabric_w - 2 * margin
     usable_l = fabric_l - 2 * margin
 
+    # Online mode fed in offline (area-descending) order gives the same layout,
+    # but places one rectangle per call, so each placement can be streamed and
+    # the run can stop between pieces
     packer = newPacker(
-        mode=PackingMode.Offline,
+        mode=PackingMode.Online,
         pack_algo=MaxRectsBssf,
         rotation=True
     )
-
-    pieces_meta: List[Dict[str, Any]] = []
-    for p in input_data["pieces"]:
-        meta = compute_piece_metadata(p)
-        packer.add_rect(meta["width_cm"], meta["height_cm"], rid=meta["id"])
-        pieces_meta.append(meta)
-
     packer.add_bin(usable_w, usable_l)
-    packer.pack()
 
+    pieces_meta = compute_pieces_metadata(input_data["pieces"], control)
+    total_count = len(input_data["pieces"])
     placements: List[Dict[str, Any]] = []
     placed_area = 0.0
+    placed_count = 0
+
+    for meta in sorted(pieces_meta, key=lambda m: m["width_cm"] * m["height_cm"], reverse=True):
+        if control.should_stop():
+            break
+        if not packer.add_rect(meta["width_cm"], meta["height_cm"], rid=meta["id"]):
+            control.skip(meta)
+            continue
 
-    for (_bin, x, y, w, h, rid) in packer.rect_list():
-        meta = next(m for m in pieces_meta if m["id"] == rid)
+        # online mode fixes the position immediately: the bin's newest rectangle
+        rect = packer[0][-1]
+        w, h = rect.width, rect.height
         rotated = (w, h) != (meta["width_cm"], meta["height_cm"])
         verts = meta["normalized_vertices_cm"]
         if rotated:
             # swap x/y in normalized vertices
             verts = [[y0, x0] for x0, y0 in verts]
 
-        placements.append({
-            "id": rid,
-            "x_cm": x + margin,
-            "y_cm": y + margin,
+        control.record(placements, {
+            "id": meta["id"],
+            "x_cm": rect.x + margin,
+            "y_cm": rect.y + margin,
             "width_cm": w,
             "height_cm": h,
             "is_rotated": rotated,
@@ -56,9 +63,12 @@ def pack_with_maxrects(input_data: Dict[str, Any]) -> Dict[str, Any]:
         })
         placement_order += 1
         placed_area += meta["area_cm2"]
-        # logger.info("Placed piece '%s' at (%.2f, %.2f)", rid, x + margin, y + margin)
+        placed_count += 1
+        control.report(placed_count, total_count, placed_area, fabric_w * fabric_l)
+        # logger.info("Placed piece '%s' at (%.2f, %.2f)", meta["id"], rect.x + margin, rect.y + margin)
 
     total_area = fabric_w * fabric_l
+    control.report(placed_count, total_count, placed_area, total_area, force=True)
     waste = total_area - placed_area
 
     return {
@@ -66,8 +76,9 @@ def pack_with_maxrects(input_data: Dict[str, Any]) -> Dict[str, Any]:
         "placements": placements,
         "fabric_width_cm": fabric_w,
         "fabric_length_cm": fabric_l,
-        "placed_count": len(placements),
-        "total_count": len(pieces_meta),
+        "placed_count": placed_count,
+        "total_count": total_count,
         "placed_area_cm2": round(placed_area, 2),
         "waste_area_cm2": round(waste, 2),
+        "complete": not control.interrupted,
     }
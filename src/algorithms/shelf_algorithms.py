@@ -1,7 +1,6 @@
-from copy import deepcopy
 from typing import Any, Dict, List, Optional, Tuple
 
-from .common import compute_piece_metadata
+from .common import PackControl, compute_pieces_metadata
 from ..utils.logger_utils import logger
 
 
@@ -45,7 +44,9 @@ def _shelf_fit_base(
     metas: List[Dict[str, Any]],
     fabric_width: float,
     fabric_length: float,
-    margin: float
+    margin: float,
+    control: PackControl,
+    total_count: int
 ) -> Tuple[List[Dict[str, Any]], List[Shelf], float, int]:
 
     placements: List[Dict[str, Any]] = []
@@ -53,7 +54,10 @@ def _shelf_fit_base(
     placed_area = 0.0
     placed_count = 0
     placement_order = 1
+    fabric_area = fabric_width * fabric_length
     for meta in metas:
+        if control.should_stop():
+            break
         pid = meta["id"]
         width = meta["width_cm"]
         height = meta["height_cm"]
@@ -77,13 +81,14 @@ def _shelf_fit_base(
             y = (shelves[-1].y + shelves[-1].height + margin) if shelves else 0.0
             if y + height > fabric_length:
                 # logger.info("Skipping '%s': no vertical space", pid)
+                control.skip(meta)
                 continue
             shelf = Shelf(y, height, margin)
             shelves.append(shelf)
             x = shelf.place_on_floor(pid, width)
 
         # 3) Record placement
-        placements.append({
+        control.record(placements, {
             "id": pid,
             "x_cm": x,
             "y_cm": y,
@@ -94,11 +99,13 @@ def _shelf_fit_base(
         placement_order += 1
         placed_area += meta["area_cm2"]
         placed_count += 1
+        control.report(placed_count, total_count, placed_area, fabric_area)
 
+    control.report(placed_count, total_count, placed_area, fabric_area, force=True)
     return placements, shelves, placed_area, placed_count
 
 
-def pack_shelf_fit_bwf(input_data: Dict[str, Any]) -> Dict[str, Any]:
+def pack_shelf_fit_bwf(input_data: Dict[str, Any], control: Optional[PackControl] = None) -> Dict[str, Any]:
 
     version = "Shelf Fit BWF"
     # logger.info("========= %s =========", version)
@@ -106,9 +113,11 @@ def pack_shelf_fit_bwf(input_data: Dict[str, Any]) -> Dict[str, Any]:
     fw = input_data["fabric_width_cm"]
     fl = input_data["fabric_length_cm"]
     m = input_data["fabric_margin_cm"]
-    metas = [compute_piece_metadata(p) for p in input_data["pieces"]]
+    control = control or PackControl()
+    metas = compute_pieces_metadata(input_data["pieces"], control)
+    total_count = len(input_data["pieces"])
 
-    placements, shelves, area, count = _shelf_fit_base(metas, fw, fl, m)
+    placements, shelves, area, count = _shelf_fit_base(metas, fw, fl, m, control, total_count)
     waste = fw * fl - area
 
     return {
@@ -118,56 +127,64 @@ def pack_shelf_fit_bwf(input_data: Dict[str, Any]) -> Dict[str, Any]:
         "fabric_width_cm": fw,
         "fabric_length_cm": fl,
         "placed_count": count,
-        "total_count": len(metas),
+        "total_count": total_count,
         "placed_area_cm2": round(area, 2),
         "waste_area_cm2": round(waste, 2),
+        "complete": not control.interrupted,
     }
 
 
-def pack_shelf_fit_bfdh(input_data: Dict[str, Any]) -> Dict[str, Any]:
+def pack_shelf_fit_bfdh(input_data: Dict[str, Any], control: Optional[PackControl] = None) -> Dict[str, Any]:
 
     version = "Shelf Fit BFDH"
     # logger.info("========= %s =========", version)
 
-    data = deepcopy(input_data)
-    metas = [compute_piece_metadata(p) for p in data["pieces"]]
+    fw = input_data["fabric_width_cm"]
+    fl = input_data["fabric_length_cm"]
+    control = control or PackControl()
+    metas = compute_pieces_metadata(input_data["pieces"], control)
     metas.sort(key=lambda m: m["height_cm"], reverse=True)
+    total_count = len(input_data["pieces"])
 
     placements, shelves, area, count = _shelf_fit_base(
         metas,
-        data["fabric_width_cm"],
-        data["fabric_length_cm"],
-        data["fabric_margin_cm"]
+        fw,
+        fl,
+        input_data["fabric_margin_cm"],
+        control,
+        total_count
     )
-    waste = data["fabric_width_cm"] * data["fabric_length_cm"] - area
+    waste = fw * fl - area
 
     return {
         "version": version,
         "placements": placements,
         "shelves": [{"y_cm": s.y, "height_cm": s.height} for s in shelves],
-        "fabric_width_cm": data["fabric_width_cm"],
-        "fabric_length_cm": data["fabric_length_cm"],
+        "fabric_width_cm": fw,
+        "fabric_length_cm": fl,
         "placed_count": count,
-        "total_count": len(metas),
+        "total_count": total_count,
         "placed_area_cm2": round(area, 2),
         "waste_area_cm2": round(waste, 2),
+        "complete": not control.interrupted,
     }
 
 
-def pack_shelf_floor_ceiling(input_data: Dict[str, Any]) -> Dict[str, Any]:
+def pack_shelf_floor_ceiling(input_data: Dict[str, Any], control: Optional[PackControl] = None) -> Dict[str, Any]:
 
     version = "Shelf Floor-Ceiling"
     # logger.info("========= %s =========", version)
     placement_order = 1
 
-    data = deepcopy(input_data)
-    fw = data["fabric_width_cm"]
-    fl = data["fabric_length_cm"]
-    m = data["fabric_margin_cm"]
+    fw = input_data["fabric_width_cm"]
+    fl = input_data["fabric_length_cm"]
+    m = input_data["fabric_margin_cm"]
+    control = control or PackControl()
 
     # 1) Sort by longest side descending
-    metas = [compute_piece_metadata(p) for p in data["pieces"]]
+    metas = compute_pieces_metadata(input_data["pieces"], control)
     metas.sort(key=lambda m: max(m["width_cm"], m["height_cm"]), reverse=True)
+    total_count = len(input_data["pieces"])
 
     placements: List[Dict[str, Any]] = []
     shelves: List[Shelf] = []
@@ -176,6 +193,8 @@ def pack_shelf_floor_ceiling(input_data: Dict[str, Any]) -> Dict[str, Any]:
     next_shelf_y = 0.0
 
     for meta in metas:
+        if control.should_stop():
+            break
         pid = meta["id"]
         w0, h0 = meta["width_cm"], meta["height_cm"]
         poly0 = meta["normalized_vertices_cm"]
@@ -238,6 +257,7 @@ def pack_shelf_floor_ceiling(input_data: Dict[str, Any]) -> Dict[str, Any]:
 
             if next_shelf_y + shelf_h > fl:
                 # logger.warning("Skipping '%s' – no vertical space for new shelf", pid)
+                control.skip(meta)
                 continue
 
             sh = Shelf(next_shelf_y, shelf_h, m, fw)
@@ -250,7 +270,7 @@ def pack_shelf_floor_ceiling(input_data: Dict[str, Any]) -> Dict[str, Any]:
 
         # record final placement
         if placed or not shelves or shelves[-1].piece_ids[-1] == pid:
-            placements.append({
+            control.record(placements, {
                 "id": pid,
                 "x_cm": x,
                 "y_cm": y,
@@ -260,7 +280,9 @@ def pack_shelf_floor_ceiling(input_data: Dict[str, Any]) -> Dict[str, Any]:
             total_area += meta["area_cm2"]
             placed_count += 1
             placement_order += 1
+            control.report(placed_count, total_count, total_area, fw * fl)
 
+    control.report(placed_count, total_count, total_area, fw * fl, force=True)
     waste = fw * fl - total_area
     return {
         "version": version,
@@ -269,7 +291,8 @@ def pack_shelf_floor_ceiling(input_data: Dict[str, Any]) -> Dict[str, Any]:
         "fabric_width_cm": fw,
         "fabric_length_cm": fl,
         "placed_count": placed_count,
-        "total_count": len(metas),
+        "total_count": total_count,
         "placed_area_cm2": round(total_area, 2),
         "waste_area_cm2": round(waste, 2),
+        "complete": not control.interrupted,
     }
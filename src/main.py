@@ -1,24 +1,78 @@
+import argparse
+import time
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
 from src.algorithms import PACKERS
 from src.utils.config_loader import load_yaml_config
 from src.utils.io_utils import load_input_data
+from src.utils.logger_utils import logger
+from src.utils.output_writer import OUTPUT_FORMATS, open_placement_writer
 from visualize import plot_packing_results, print_summary_table
 
 
+def log_progress(update: Dict[str, Any]) -> None:
+    logger.info(
+        "%s: %d/%d pieces placed, %.1f%% utilization",
+        update["algorithm"], update["placed_count"], update["total_count"], update["utilization_pct"],
+    )
+
+
 def main() -> None:
+    parser = argparse.ArgumentParser(description="Garment packing optimizer")
+    parser.add_argument(
+        "--deadline", type=float, default=None, metavar="SECONDS",
+        help="wall-clock budget for the whole run, split evenly across the enabled algorithms "
+             "(time one leaves unused goes to the rest); partial layouts are returned when a slice runs out",
+    )
+    parser.add_argument(
+        "--output-dir", type=Path, default=None,
+        help="stream each algorithm's placements to a file in this directory while it runs",
+    )
+    parser.add_argument("--output-format", choices=tuple(OUTPUT_FORMATS), default=None)
+    parser.add_argument(
+        "--no-keep-placements", action="store_true",
+        help="only stream placements instead of holding them in memory (disables plotting)",
+    )
+    args = parser.parse_args()
+
     config = load_yaml_config()
     data_path = Path(config.get("input_file", "../input/input1.json"))
     input_data = load_input_data(data_path)
 
+    deadline_s: Optional[float] = args.deadline if args.deadline is not None else config.get("deadline_s")
+    output_config = config.get("output") or {}
+    output_dir = args.output_dir or output_config.get("dir")
+    output_format = args.output_format or output_config.get("format", "ndjson")
+    keep_placements = not args.no_keep_placements and output_config.get("keep_placements", True)
+    if output_dir is None:
+        keep_placements = True
+    else:
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+    start = time.perf_counter()
+
     results: List[Dict[str, Any]] = []
-    for pack in PACKERS:
-        res = pack(input_data)
+    for i, pack in enumerate(PACKERS):
+        budget = None
+        if deadline_s is not None:
+            remaining = max(0.0, deadline_s - (time.perf_counter() - start))
+            budget = remaining / (len(PACKERS) - i)
+        if output_dir is None:
+            res = pack(input_data, time_budget_s=budget, progress=log_progress)
+        else:
+            out_path = output_dir / f"{pack.__name__}{OUTPUT_FORMATS[output_format]}"
+            with open_placement_writer(out_path, output_format) as writer:
+                res = pack(input_data, time_budget_s=budget, progress=log_progress,
+                           writer=writer, keep_placements=keep_placements)
+            logger.info("Wrote placements to %s", out_path)
         results.append(res)
 
     print_summary_table(results)
-    plot_packing_results(results)
+    if keep_placements:
+        plot_packing_results(results)
+    else:
+        logger.info("Placements were only streamed to %s; skipping plot.", output_dir)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,37 @@
+import struct
+from typing import Any, Dict
+
+# Binary piece file: header (fabric sizes as float64), then per piece <H id_len, id, <H n_vertices, n * <ff
+BINARY_INPUT_MAGIC = b"GPOI"
+BINARY_INPUT_VERSION = 2
+BINARY_INPUT_HEADER = struct.Struct("<4sHdddI")
+_U16 = struct.Struct("<H")
+
+
+def load_binary_input(raw: bytes) -> Dict[str, Any]:
+    magic, version, width, length, margin, count = BINARY_INPUT_HEADER.unpack_from(raw, 0)
+    if magic != BINARY_INPUT_MAGIC or version != BINARY_INPUT_VERSION:
+        raise ValueError(f"Unsupported binary input (magic={magic!r}, version={version})")
+
+    pieces = []
+    offset = BINARY_INPUT_HEADER.size
+    for _ in range(count):
+        (id_len,) = _U16.unpack_from(raw, offset)
+        offset += _U16.size
+        pid = raw[offset:offset + id_len].decode("utf-8")
+        offset += id_len
+        (n_vertices,) = _U16.unpack_from(raw, offset)
+        offset += _U16.size
+        coords = struct.unpack_from(f"<{2 * n_vertices}f", raw, offset)
+        offset += 8 * n_vertices
+        pieces.append({
+            "id": pid,
+            "vertices_cm": [[round(x, 2), round(y, 2)] for x, y in zip(coords[::2], coords[1::2])],
+        })
+
+    return {
+        "fabric_width_cm": width,
+        "fabric_length_cm": length,
+        "fabric_margin_cm": margin,
+        "pieces": pieces,
+    }
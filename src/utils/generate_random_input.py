@@ -1,52 +1,283 @@
+import argparse
 import json
-import random
-import math
-
-def generate_random_polygon(w: float, h: float, num_vertices: int) -> list:
-    """Generate a simple polygon with given bounding box dimensions."""
-    angles = sorted([random.uniform(0, 2 * math.pi) for _ in range(num_vertices)])
-    radius_w = w / 2
-    radius_h = h / 2
-    cx, cy = radius_w, radius_h
-    points = []
-    for angle in angles:
-        rx = cx + radius_w * math.cos(angle) * random.uniform(0.5, 1.0)
-        ry = cy + radius_h * math.sin(angle) * random.uniform(0.5, 1.0)
-        points.append([rx, ry])
-
-    # Normalize to (0,0)
-    min_x = min(x for x, y in points)
-    min_y = min(y for x, y in points)
-    return [[round(x - min_x, 2), round(y - min_y, 2)] for x, y in points]
-
-def generate_big_polygon_input(
-    filename: str = "../../input/big_polygon_input_400.json",
+import struct
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+
+import numpy as np
+
+from src.utils.binary_input import BINARY_INPUT_HEADER, BINARY_INPUT_MAGIC, BINARY_INPUT_VERSION
+
+DISTRIBUTIONS = ("rectangles", "convex", "garment", "size_runs", "mixed")
+
+# Unit outlines for concave garment-like pieces (x right, y up, bbox = [0, 1] x [0, 1])
+GARMENT_TEMPLATES: Dict[str, np.ndarray] = {
+    "bodice": np.array([
+        [0.00, 0.00], [1.00, 0.00], [1.00, 0.72], [0.88, 0.80], [0.82, 1.00],
+        [0.62, 1.00], [0.50, 0.90], [0.38, 1.00], [0.18, 1.00], [0.12, 0.80],
+        [0.00, 0.72],
+    ]),
+    "sleeve": np.array([
+        [0.10, 0.00], [0.90, 0.00], [1.00, 0.70], [0.80, 0.92], [0.50, 1.00],
+        [0.20, 0.92], [0.00, 0.70],
+    ]),
+    "trouser_leg": np.array([
+        [0.05, 0.00], [0.45, 0.00], [0.52, 0.60], [0.60, 0.60], [1.00, 0.78],
+        [1.00, 1.00], [0.00, 1.00],
+    ]),
+    "collar": np.array([
+        [0.00, 0.00], [1.00, 0.00], [1.00, 0.65], [0.70, 0.40], [0.30, 0.40],
+        [0.00, 0.65],
+    ]),
+    "pocket": np.array([
+        [0.00, 0.15], [0.50, 0.00], [1.00, 0.15], [1.00, 1.00], [0.00, 1.00],
+    ]),
+}
+
+# Nominal (width, height) in cm of the base size for each template
+GARMENT_BASE_SIZES: Dict[str, Tuple[float, float]] = {
+    "bodice": (48.0, 70.0),
+    "sleeve": (40.0, 60.0),
+    "trouser_leg": (34.0, 105.0),
+    "collar": (42.0, 9.0),
+    "pocket": (15.0, 17.0),
+}
+
+SIZE_GRADES = {"XS": 0.90, "S": 0.95, "M": 1.00, "L": 1.06, "XL": 1.12}
+
+# Pieces are drawn in fixed blocks, each with its own seeded stream, so the
+# output does not depend on how the blocks are regrouped into write chunks
+_RNG_BLOCK_SIZE = 4096
+
+
+def _sample_dimensions(rng: np.random.Generator, count: int, max_width: float) -> Tuple[np.ndarray, np.ndarray]:
+    # Log-normal sizes: many small pieces, a long tail of large panels
+    w = rng.lognormal(mean=np.log(22.0), sigma=0.55, size=count)
+    h = w * rng.lognormal(mean=np.log(1.4), sigma=0.35, size=count)
+    w = np.clip(w, 3.0, max_width)
+    h = np.clip(h, 3.0, 2.5 * max_width)
+    return w, h
+
+
+def _rectangles(rng: np.random.Generator, count: int, max_width: float) -> List[np.ndarray]:
+    w, h = _sample_dimensions(rng, count, max_width)
+    unit = np.array([[0.0, 0.0], [1.0, 0.0], [1.0, 1.0], [0.0, 1.0]])
+    polys = unit[None, :, :] * np.stack([w, h], axis=1)[:, None, :]
+    return list(polys)
+
+
+def _convex(rng: np.random.Generator, count: int, max_width: float) -> List[np.ndarray]:
+    w, h = _sample_dimensions(rng, count, max_width)
+    n_vertices = rng.integers(3, 9, size=count)
+    polys: List[np.ndarray] = [np.empty((0, 2))] * count
+
+    # Batch all pieces that share a vertex count; points on an ellipse are always convex
+    for k in np.unique(n_vertices):
+        idx = np.flatnonzero(n_vertices == k)
+        angles = np.sort(rng.uniform(0.0, 2 * np.pi, size=(idx.size, k)), axis=1)
+        pts = np.stack([np.cos(angles), np.sin(angles)], axis=2)
+        pts -= pts.min(axis=1, keepdims=True)
+        span = pts.max(axis=1, keepdims=True)
+        span[span == 0] = 1.0
+        pts = pts / span * np.stack([w[idx], h[idx]], axis=1)[:, None, :]
+        for i, poly in zip(idx, pts):
+            polys[i] = poly
+    return polys
+
+
+def _garment(rng: np.random.Generator, count: int, max_width: float) -> List[np.ndarray]:
+    names = list(GARMENT_TEMPLATES)
+    choice = rng.integers(0, len(names), size=count)
+    polys: List[np.ndarray] = [np.empty((0, 2))] * count
+
+    for t, name in enumerate(names):
+        idx = np.flatnonzero(choice == t)
+        if idx.size == 0:
+            continue
+        template = GARMENT_TEMPLATES[name]
+        base_w, base_h = GARMENT_BASE_SIZES[name]
+        scale = rng.normal(1.0, 0.12, size=(idx.size, 1, 2)).clip(0.6, 1.5)
+        jitter = rng.normal(0.0, 0.015, size=(idx.size, template.shape[0], 2))
+        pts = (template[None, :, :] + jitter) * np.array([base_w, base_h]) * scale
+        pts -= pts.min(axis=1, keepdims=True)
+        pts[:, :, 0] = np.minimum(pts[:, :, 0], max_width)
+        for i, poly in zip(idx, pts):
+            polys[i] = poly
+    return polys
+
+
+def _size_runs(rng: np.random.Generator, max_width: float) -> Iterator[Tuple[str, np.ndarray]]:
+    # A marker is usually a handful of styles graded across sizes, each cut several times
+    names = list(GARMENT_TEMPLATES)
+    style = 0
+    while True:
+        name = names[rng.integers(0, len(names))]
+        template = GARMENT_TEMPLATES[name]
+        base_w, base_h = GARMENT_BASE_SIZES[name]
+        style_scale = rng.normal(1.0, 0.08, size=2).clip(0.8, 1.25)
+        plies = rng.integers(1, 5, size=len(SIZE_GRADES))
+        for (size, grade), qty in zip(SIZE_GRADES.items(), plies):
+            poly = template * np.array([base_w, base_h]) * style_scale * grade
+            poly[:, 0] = np.minimum(poly[:, 0], max_width)
+            for copy in range(qty):
+                yield f"{name}_{style:04d}_{size}_{copy + 1}", poly
+        style += 1
+
+
+def _mixed(rng: np.random.Generator, count: int, max_width: float) -> List[np.ndarray]:
+    split = rng.multinomial(count, [0.3, 0.2, 0.5])
+    polys = (_rectangles(rng, split[0], max_width)
+             + _convex(rng, split[1], max_width)
+             + _garment(rng, split[2], max_width))
+    order = rng.permutation(count)
+    return [polys[i] for i in order]
+
+
+def generate_piece_chunks(
+    num_pieces: int,
+    distribution: str = "mixed",
+    seed: int = 0,
+    chunk_size: int = 10_000,
+    max_width: float = 150.0,
+) -> Iterator[List[Tuple[str, np.ndarray]]]:
+    """Yield lists of (id, vertices) pairs, ``chunk_size`` pieces at a time.
+
+    The same seed and distribution always produce the same pieces, whatever
+    the chunk size.
+    """
+    if distribution not in DISTRIBUTIONS:
+        raise ValueError(f"Unknown distribution '{distribution}', expected one of {DISTRIBUTIONS}")
+    if num_pieces < 0:
+        raise ValueError(f"num_pieces must be >= 0, got {num_pieces}")
+    if chunk_size <= 0:
+        raise ValueError(f"chunk_size must be > 0, got {chunk_size}")
+
+    if distribution == "size_runs":
+        pieces = islice(_size_runs(np.random.default_rng(seed), max_width), num_pieces)
+    else:
+        pieces = _piece_blocks(num_pieces, distribution, seed, max_width)
+
+    while True:
+        chunk = list(islice(pieces, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _piece_blocks(num_pieces: int, distribution: str, seed: int, max_width: float) -> Iterator[Tuple[str, np.ndarray]]:
+    sample = {
+        "rectangles": _rectangles,
+        "convex": _convex,
+        "garment": _garment,
+        "mixed": _mixed,
+    }[distribution]
+    for block, start in enumerate(range(0, num_pieces, _RNG_BLOCK_SIZE)):
+        rng = np.random.default_rng([seed, block])
+        count = min(_RNG_BLOCK_SIZE, num_pieces - start)
+        for i, poly in enumerate(sample(rng, count, max_width)):
+            yield f"piece_{start + i:07d}", poly
+
+
+def write_json_stream(path: Path, header: Dict[str, Any], chunks: Iterator[List[Tuple[str, np.ndarray]]]) -> int:
+    written = 0
+    with open(path, "w") as f:
+        head = json.dumps(header, separators=(",", ":"))
+        f.write(head[:-1] + ',"pieces":[')
+        for chunk in chunks:
+            pieces = [{"id": pid, "vertices_cm": np.round(poly, 2).tolist()} for pid, poly in chunk]
+            body = json.dumps(pieces, separators=(",", ":"))[1:-1]
+            if written and body:
+                f.write(",")
+            f.write(body)
+            written += len(chunk)
+        f.write("]}")
+    return written
+
+
+def write_binary_stream(path: Path, header: Dict[str, Any], num_pieces: int,
+                        chunks: Iterator[List[Tuple[str, np.ndarray]]]) -> int:
+    written = 0
+    with open(path, "wb") as f:
+        f.write(BINARY_INPUT_HEADER.pack(
+            BINARY_INPUT_MAGIC,
+            BINARY_INPUT_VERSION,
+            header["fabric_width_cm"],
+            header["fabric_length_cm"],
+            header["fabric_margin_cm"],
+            num_pieces,
+        ))
+        for chunk in chunks:
+            records = []
+            for pid, poly in chunk:
+                raw_id = pid.encode("utf-8")
+                records.append(struct.pack("<H", len(raw_id)))
+                records.append(raw_id)
+                records.append(struct.pack("<H", len(poly)))
+                records.append(np.round(poly, 2).astype("<f4").tobytes())
+            f.write(b"".join(records))
+            written += len(chunk)
+    return written
+
+
+def generate_input_file(
+    filename: str = "input/generated_input.json",
     num_pieces: int = 400,
-    fabric_width: int = 500,
-    fabric_length: int = 700,
-    margin: int = 0
-):
-    data = {
+    fabric_width: float = 500,
+    fabric_length: float = 700,
+    margin: float = 0,
+    distribution: str = "mixed",
+    seed: int = 0,
+    chunk_size: int = 10_000,
+    fmt: str = "json",
+) -> None:
+    header = {
         "fabric_length_cm": fabric_length,
         "fabric_width_cm": fabric_width,
         "fabric_margin_cm": margin,
-        "pieces": []
     }
+    chunks = generate_piece_chunks(num_pieces, distribution, seed, chunk_size, max_width=fabric_width)
+
+    path = Path(filename)
+    if fmt == "bin":
+        written = write_binary_stream(path, header, num_pieces, chunks)
+    else:
+        written = write_json_stream(path, header, chunks)
+    print(f"✅ Wrote {written} '{distribution}' pieces (seed {seed}) to {path}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate reproducible garment packing inputs.")
+    parser.add_argument("-o", "--output", default="input/generated_input.json")
+    parser.add_argument("-n", "--num-pieces", type=int, default=400)
+    parser.add_argument("--fabric-width", type=float, default=500)
+    parser.add_argument("--fabric-length", type=float, default=700)
+    parser.add_argument("--margin", type=float, default=0)
+    parser.add_argument("-d", "--distribution", choices=DISTRIBUTIONS, default="mixed")
+    parser.add_argument("-s", "--seed", type=int, default=0)
+    parser.add_argument("--chunk-size", type=int, default=10_000,
+                        help="pieces per write; does not change the generated pieces")
+    parser.add_argument("-f", "--format", dest="fmt", choices=("json", "bin"), default=None,
+                        help="defaults to 'bin' for .bin outputs, 'json' otherwise")
+    args = parser.parse_args()
+    if args.num_pieces < 0:
+        parser.error("--num-pieces must be >= 0")
+    if args.chunk_size <= 0:
+        parser.error("--chunk-size must be > 0")
+
+    fmt = args.fmt or ("bin" if args.output.endswith(".bin") else "json")
+    generate_input_file(
+        filename=args.output,
+        num_pieces=args.num_pieces,
+        fabric_width=args.fabric_width,
+        fabric_length=args.fabric_length,
+        margin=args.margin,
+        distribution=args.distribution,
+        seed=args.seed,
+        chunk_size=args.chunk_size,
+        fmt=fmt,
+    )
 
-    for i in range(1, num_pieces + 1):
-        w = random.uniform(5, 50)
-        h = random.uniform(5, 100)
-        num_vertices = random.randint(3, 6)
-        polygon = generate_random_polygon(w, h, num_vertices)
-        piece = {
-            "id": f"piece_{i:04d}",
-            "vertices_cm": polygon
-        }
-        data["pieces"].append(piece)
-
-    with open(filename, "w") as f:
-        json.dump(data, f, indent=2)
-    print(f"✅ Wrote {num_pieces} random polygons to {filename}")
 
 if __name__ == "__main__":
-    generate_big_polygon_input()
+    main()
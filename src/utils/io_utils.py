@@ -1,13 +1,17 @@
 import json
 from pathlib import Path
 from typing import Any, Dict
+from .binary_input import BINARY_INPUT_MAGIC, load_binary_input
 from .logger_utils import logger
 
 
 def load_input_data(path: Path) -> Dict[str, Any]:
     logger.info("Loading input from %s", path)
-    raw = path.read_text()
-    data = json.loads(raw)
+    raw = path.read_bytes()
+    if raw[:len(BINARY_INPUT_MAGIC)] == BINARY_INPUT_MAGIC:
+        data = load_binary_input(raw)
+    else:
+        data = json.loads(raw)
     count = len(data.get("pieces", []))
     logger.info("%d pieces loaded\n", count)
     return data
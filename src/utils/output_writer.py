@@ -0,0 +1,197 @@
+import json
+import struct
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, TextIO, Tuple
+
+# Binary placement stream: magic + version, then tagged records.
+#   b"H" <I len> header JSON
+#   b"P" <I order> <ff x, y> <B flags> [<ff width, height>] <H id_len> id <H n_vertices> n * <ff
+#   b"S" <I len> summary JSON (trailer)
+BINARY_OUTPUT_MAGIC = b"GPOL"
+BINARY_OUTPUT_VERSION = 2
+_PREAMBLE = struct.Struct("<4sH")
+_U16 = struct.Struct("<H")
+_U32 = struct.Struct("<I")
+_PLACEMENT = struct.Struct("<IffB")
+_SIZE = struct.Struct("<ff")
+
+# Placement flags: which optional fields the record carries, so both formats share one schema
+_HAS_ROTATION = 0x01
+_ROTATED = 0x02
+_HAS_SIZE = 0x04
+
+OUTPUT_FORMATS = {"ndjson": ".ndjson", "bin": ".bin"}
+
+
+class PlacementWriter(ABC):
+
+    @abstractmethod
+    def write_header(self, header: Dict[str, Any]) -> None:
+        ...
+
+    @abstractmethod
+    def write_placement(self, placement: Dict[str, Any]) -> None:
+        ...
+
+    @abstractmethod
+    def write_summary(self, summary: Dict[str, Any]) -> None:
+        ...
+
+    @abstractmethod
+    def close(self) -> None:
+        ...
+
+    def __enter__(self) -> "PlacementWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class NdjsonPlacementWriter(PlacementWriter):
+
+    def __init__(self, path: Path):
+        # line-buffered so readers see every record as soon as it is written
+        self._file: TextIO = open(path, "w", buffering=1)
+
+    def _write(self, record_type: str, record: Dict[str, Any]) -> None:
+        # one write per record, so a line never reaches the file without its newline
+        self._file.write(json.dumps({"type": record_type, **record}, separators=(",", ":")) + "\n")
+
+    def write_header(self, header: Dict[str, Any]) -> None:
+        self._write("header", header)
+
+    def write_placement(self, placement: Dict[str, Any]) -> None:
+        self._write("placement", placement)
+
+    def write_summary(self, summary: Dict[str, Any]) -> None:
+        self._write("summary", summary)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class BinaryPlacementWriter(PlacementWriter):
+
+    def __init__(self, path: Path):
+        self._file: BinaryIO = open(path, "wb")
+        self._file.write(_PREAMBLE.pack(BINARY_OUTPUT_MAGIC, BINARY_OUTPUT_VERSION))
+
+    def _write_json(self, tag: bytes, record: Dict[str, Any]) -> None:
+        raw = json.dumps(record, separators=(",", ":")).encode("utf-8")
+        self._file.write(tag + _U32.pack(len(raw)) + raw)
+        self._file.flush()
+
+    def write_header(self, header: Dict[str, Any]) -> None:
+        self._write_json(b"H", header)
+
+    def write_placement(self, placement: Dict[str, Any]) -> None:
+        raw_id = str(placement["id"]).encode("utf-8")
+        verts = placement["normalized_vertices_cm"]
+        flags = 0
+        if "is_rotated" in placement:
+            flags |= _HAS_ROTATION | (_ROTATED if placement["is_rotated"] else 0)
+        size = b""
+        if "width_cm" in placement:
+            flags |= _HAS_SIZE
+            size = _SIZE.pack(placement["width_cm"], placement["height_cm"])
+        self._file.write(b"".join((
+            b"P",
+            _PLACEMENT.pack(
+                placement["placement_order"],
+                placement["x_cm"],
+                placement["y_cm"],
+                flags,
+            ),
+            size,
+            _U16.pack(len(raw_id)),
+            raw_id,
+            _U16.pack(len(verts)),
+            struct.pack(f"<{2 * len(verts)}f", *(c for v in verts for c in v)),
+        )))
+        self._file.flush()
+
+    def write_summary(self, summary: Dict[str, Any]) -> None:
+        self._write_json(b"S", summary)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def open_placement_writer(path: Path, fmt: str = "ndjson") -> PlacementWriter:
+    if fmt == "ndjson":
+        return NdjsonPlacementWriter(path)
+    if fmt == "bin":
+        return BinaryPlacementWriter(path)
+    raise ValueError(f"Unknown output format '{fmt}', expected one of {tuple(OUTPUT_FORMATS)}")
+
+
+class _Truncated(Exception):
+    pass
+
+
+def _read_exact(f: BinaryIO, size: int) -> bytes:
+    raw = f.read(size)
+    if len(raw) < size:
+        raise _Truncated
+    return raw
+
+
+def _iter_binary_records(f: BinaryIO) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    try:
+        magic, version = _PREAMBLE.unpack(_read_exact(f, _PREAMBLE.size))
+    except _Truncated:
+        return
+    if magic != BINARY_OUTPUT_MAGIC or version != BINARY_OUTPUT_VERSION:
+        raise ValueError(f"Unsupported placement stream (magic={magic!r}, version={version})")
+
+    while True:
+        tag = f.read(1)
+        if not tag:
+            return
+        try:
+            if tag in (b"H", b"S"):
+                (length,) = _U32.unpack(_read_exact(f, _U32.size))
+                record = json.loads(_read_exact(f, length))
+                yield ("header" if tag == b"H" else "summary"), record
+            elif tag == b"P":
+                order, x, y, flags = _PLACEMENT.unpack(_read_exact(f, _PLACEMENT.size))
+                record = {"id": None, "x_cm": x, "y_cm": y}
+                if flags & _HAS_SIZE:
+                    record["width_cm"], record["height_cm"] = _SIZE.unpack(_read_exact(f, _SIZE.size))
+                if flags & _HAS_ROTATION:
+                    record["is_rotated"] = bool(flags & _ROTATED)
+                (id_len,) = _U16.unpack(_read_exact(f, _U16.size))
+                record["id"] = _read_exact(f, id_len).decode("utf-8")
+                (n_vertices,) = _U16.unpack(_read_exact(f, _U16.size))
+                coords = struct.unpack(f"<{2 * n_vertices}f", _read_exact(f, 8 * n_vertices))
+                record["normalized_vertices_cm"] = [[cx, cy] for cx, cy in zip(coords[::2], coords[1::2])]
+                record["placement_order"] = order
+                yield "placement", record
+            else:
+                raise ValueError(f"Corrupt placement stream: unknown record tag {tag!r}")
+        except _Truncated:
+            # the writer has not finished this record yet
+            return
+
+
+def iter_placement_stream(path: Path) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Yield ``(record_type, record)`` pairs from an NDJSON or binary placement stream.
+
+    A stream that is still being written may end in a partial record; reading
+    stops cleanly before it, so the file can be read again later for more.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(BINARY_OUTPUT_MAGIC)) == BINARY_OUTPUT_MAGIC:
+            f.seek(0)
+            yield from _iter_binary_records(f)
+            return
+        f.seek(0)
+        for line in f:
+            if not line.endswith(b"\n"):
+                # partial last line of a stream still being written
+                return
+            if line.strip():
+                record = json.loads(line)
+                yield record.pop("type"), record
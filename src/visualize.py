@@ -99,10 +99,11 @@ def print_summary_table(results: List[Dict[str, Any]]) -> None:
             f"{used:.3f} m²",
             f"{waste:.3f} m²",
             f"{util:.1f}%",
+            "complete" if r.get("complete", True) else "partial",
         ])
 
     print("\n" + tabulate(
         rows,
-        headers=["Algorithm", "Placed", "Fabric Area", "Used Area", "Waste", "Utilization"],
+        headers=["Algorithm", "Placed", "Fabric Area", "Used Area", "Waste", "Utilization", "Status"],
         tablefmt="fancy_grid",
     ))